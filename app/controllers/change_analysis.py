@@ -0,0 +1,260 @@
+import asyncio
+import logging
+from fnmatch import fnmatchcase
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from controllers.repo_sync import execute_git_command
+
+# Git gebruikt dit object id voor "geen blob" (toegevoegd of verwijderd bestand)
+NULL_OID = "0" * 40
+
+DEFAULT_COMPONENT = "other"
+
+
+def match_path(path: str, patterns: List[str]) -> bool:
+    """Controleer of een pad overeenkomt met een van de glob patronen"""
+    return any(fnmatchcase(path, pattern) for pattern in patterns)
+
+
+def classify_path(path: str, classification: Dict[str, List[str]]) -> str:
+    """Bepaal bij welk component een pad hoort (eerste match wint)"""
+    for component, patterns in classification.items():
+        if match_path(path, patterns):
+            return component
+    return DEFAULT_COMPONENT
+
+
+def parse_raw_diff(raw: str, max_files: int) -> Tuple[List[Dict], List[str], bool]:
+    """
+    Parse `git diff --raw -z` output naar entries en de blob ids waarvan de
+    grootte opgevraagd moet worden. Draait in een worker process.
+    """
+    parts = raw.split("\0")
+    entries = []
+    blob_ids = set()
+    truncated = False
+
+    i = 0
+    while i + 1 < len(parts):
+        header, path = parts[i], parts[i + 1]
+        i += 2
+        if not header.startswith(":"):
+            continue
+        if len(entries) >= max_files:
+            truncated = True
+            break
+
+        _, _, old_oid, new_oid, status = header[1:].split(" ", 4)
+        entries.append({
+            "path": path,
+            "status": status[0],
+            "old_oid": old_oid,
+            "new_oid": new_oid
+        })
+        blob_ids.update(oid for oid in (old_oid, new_oid) if oid != NULL_OID)
+
+    return entries, sorted(blob_ids), truncated
+
+
+def summarize_changes(entries: List[Dict], numstat: str, blob_sizes: str,
+                      classification: Dict[str, List[str]]) -> Dict:
+    """
+    Combineer diff entries, regelstatistieken en blob groottes tot een
+    samenvatting per component. Draait in een worker process.
+    """
+    line_stats = {}
+    for record in numstat.split("\0"):
+        fields = record.split("\t", 2)
+        if len(fields) != 3:
+            continue
+        added, deleted, path = fields
+        # Binaire bestanden rapporteren "-" in plaats van regelaantallen
+        line_stats[path] = (
+            None if added == "-" else int(added),
+            None if deleted == "-" else int(deleted)
+        )
+
+    sizes = {}
+    for line in blob_sizes.splitlines():
+        oid, _, size = line.partition(" ")
+        if size.isdigit():
+            sizes[oid] = int(size)
+
+    summary = {
+        "files": 0,
+        "insertions": 0,
+        "deletions": 0,
+        "binary_files": 0,
+        "size_delta": 0,
+        "components": {},
+        "largest": []
+    }
+
+    for entry in entries:
+        path = entry["path"]
+        added, deleted = line_stats.get(path, (0, 0))
+        binary = added is None
+        added, deleted = added or 0, deleted or 0
+        size_delta = sizes.get(entry["new_oid"], 0) - sizes.get(entry["old_oid"], 0)
+
+        summary["files"] += 1
+        summary["insertions"] += added
+        summary["deletions"] += deleted
+        summary["binary_files"] += int(binary)
+        summary["size_delta"] += size_delta
+
+        component = summary["components"].setdefault(classify_path(path, classification), {
+            "files": 0,
+            "insertions": 0,
+            "deletions": 0,
+            "size_delta": 0
+        })
+        component["files"] += 1
+        component["insertions"] += added
+        component["deletions"] += deleted
+        component["size_delta"] += size_delta
+
+        summary["largest"].append((path, added + deleted))
+
+    summary["largest"] = [
+        path for path, _ in sorted(summary["largest"], key=lambda item: item[1], reverse=True)[:5]
+    ]
+    return summary
+
+
+class ChangeAnalyzer:
+    """
+    Voert de analyse na een pull op de achtergrond uit in een process pool,
+    zodat grote merges de event loop en de volgende sync cyclus niet
+    ophouden. Het aantal wachtende en lopende analyses is begrensd; bij
+    overbelasting wordt een nieuwe analyse overgeslagen in plaats van
+    te wachten. Resultaten gaan naar de `on_result` callback.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 4, timeout: float = 60,
+                 max_files: int = 5000, classification: Optional[Dict[str, List[str]]] = None,
+                 on_result: Optional[Callable[[str, Dict], Awaitable[None]]] = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_files = max_files
+        self.classification = classification or {}
+        self.on_result = on_result
+        self.dropped = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict],
+                    on_result: Optional[Callable[[str, Dict], Awaitable[None]]] = None) -> Optional["ChangeAnalyzer"]:
+        """Maak een analyzer op basis van de `analysis` configuratie sectie"""
+        if not config or not config.get("enabled", True):
+            return None
+        return cls(
+            max_workers=config.get("max_workers", 2),
+            max_pending=config.get("max_pending", 4),
+            timeout=config.get("timeout", 60),
+            max_files=config.get("max_files", 5000),
+            classification=config.get("classification"),
+            on_result=on_result
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Lazy import: multiprocessing wordt pas geladen bij de eerste analyse
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _retire_executor(self, executor) -> None:
+        """
+        Vervang een pool met een vastgelopen job. De oude pool neemt geen
+        nieuwe jobs meer aan, maar lopende jobs van andere analyses maken
+        hun werk af; de workers stoppen zodra de pool leeg is.
+        """
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(executor, func, *args), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._retire_executor(executor)
+            raise
+
+    def submit(self, repo_name: str, local_path: str, before_hash: str, after_hash: str) -> bool:
+        """
+        Plan een analyse op de achtergrond. Geeft False terug als de wachtrij
+        vol is en de analyse daarom overgeslagen wordt.
+        """
+        if len(self._tasks) >= self.max_pending:
+            self.dropped += 1
+            logging.warning(
+                f"Change analysis queue full ({self.max_pending}), skipping analysis for {repo_name} "
+                f"({self.dropped} skipped in total)"
+            )
+            return False
+
+        task = asyncio.create_task(self._analyze_and_report(repo_name, local_path, before_hash, after_hash))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _analyze_and_report(self, repo_name: str, local_path: str, before_hash: str, after_hash: str) -> None:
+        analysis = await self.analyze(local_path, before_hash, after_hash)
+        if analysis is None or self.on_result is None:
+            return
+        try:
+            await self.on_result(repo_name, analysis)
+        except Exception as e:
+            logging.error(f"Reporting change analysis for {repo_name} failed: {str(e)}")
+
+    async def analyze(self, local_path: str, before_hash: str, after_hash: str) -> Optional[Dict]:
+        """
+        Analyseer de wijzigingen tussen twee commits. Elke git aanroep en elke
+        job in de pool heeft een eigen timeout; fouten en timeouts worden
+        gelogd en leveren None op zodat de sync zelf niet faalt.
+        """
+        try:
+            raw = await execute_git_command(
+                ['git', 'diff', '--raw', '-z', '--no-renames', '--abbrev=40', before_hash, after_hash],
+                local_path,
+                timeout=self.timeout
+            )
+            entries, blob_ids, truncated = await self._run(parse_raw_diff, raw, self.max_files)
+
+            numstat = await execute_git_command(
+                ['git', 'diff', '--numstat', '-z', '--no-renames', before_hash, after_hash],
+                local_path,
+                timeout=self.timeout
+            )
+            blob_sizes = ""
+            if blob_ids:
+                blob_sizes = await execute_git_command(
+                    ['git', 'cat-file', '--batch-check=%(objectname) %(objectsize)'],
+                    local_path,
+                    input="\n".join(blob_ids) + "\n",
+                    timeout=self.timeout
+                )
+
+            summary = await self._run(
+                summarize_changes, entries, numstat, blob_sizes, self.classification
+            )
+            summary["truncated"] = truncated
+            return summary
+
+        except asyncio.TimeoutError:
+            logging.warning(f"Change analysis timed out for {local_path} after {self.timeout}s")
+        except Exception as e:
+            logging.warning(f"Change analysis failed for {local_path}: {str(e)}")
+        return None
+
+    def shutdown(self) -> None:
+        """Annuleer lopende analyses en stop de process pool"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
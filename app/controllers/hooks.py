@@ -0,0 +1,186 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from controllers.change_analysis import match_path
+
+class HookError(Exception):
+    """Custom exception voor fouten in post-sync hooks"""
+    pass
+
+def load_entry_point(entry_point: str):
+    """Laad een Python entry point in de vorm `module:functie`"""
+    module_name, _, attribute = entry_point.partition(':')
+    if not module_name or not attribute:
+        raise HookError(f"Invalid entry point: {entry_point}")
+    target = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        target = getattr(target, part)
+    return target
+
+class HookPipeline:
+    """
+    Voert per repository gedeclareerde hooks uit nadat een pull bestanden
+    heeft gewijzigd. Een hook draait alleen als een van de gewijzigde paden
+    overeenkomt met zijn `paths` globs, bijvoorbeeld:
+
+        "hooks": [
+            {"name": "reinstall", "paths": ["requirements.txt"],
+             "command": ["pip", "install", "-r", "requirements.txt"], "timeout": 600},
+            {"name": "assets", "paths": ["static/*"], "entry_point": "build:assets"}
+        ]
+
+    Hooks draaien als achtergrond taak per repository zodat de sync cyclus
+    er niet op wacht; de resultaten gaan naar de `on_result` callback.
+    Wijzigingen van snel opeenvolgende pulls worden samengevoegd zolang er
+    binnen `debounce` seconden nieuwe wijzigingen binnenkomen.
+    """
+
+    def __init__(self, max_concurrent: int = 2, debounce: float = 0, default_timeout: float = 300,
+                 on_result: Optional[Callable[[str, List[Dict]], Awaitable[None]]] = None):
+        self.debounce = debounce
+        self.default_timeout = default_timeout
+        self.on_result = on_result
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict],
+                    on_result: Optional[Callable[[str, List[Dict]], Awaitable[None]]] = None) -> "HookPipeline":
+        """Maak een pipeline op basis van de `hooks` configuratie sectie"""
+        config = config or {}
+        return cls(
+            max_concurrent=config.get('max_concurrent', 2),
+            debounce=config.get('debounce', 0),
+            default_timeout=config.get('timeout', 300),
+            on_result=on_result
+        )
+
+    def schedule(self, repo: Dict, changed_paths: List[str]) -> Optional[str]:
+        """
+        Registreer de gewijzigde paden van een sync en start de hooks op de
+        achtergrond zodra de debounce periode voorbij is. Moet elke sync
+        cyclus aangeroepen worden, ook zonder wijzigingen, zodat uitgestelde
+        hooks alsnog starten. Geeft 'started', 'deferred' of None terug.
+        """
+        if not repo.get('hooks'):
+            return None
+
+        now = time.monotonic()
+        pending = self._pending.setdefault(repo['name'], {'paths': set(), 'last_change': now})
+        if changed_paths:
+            pending['paths'].update(changed_paths)
+            pending['last_change'] = now
+
+        if not pending['paths']:
+            return None
+        # Wacht op rust na de laatste wijziging en op een eventuele vorige run
+        if now - pending['last_change'] < self.debounce or repo['name'] in self._running:
+            return 'deferred'
+
+        paths = sorted(self._pending.pop(repo['name'])['paths'])
+        task = asyncio.create_task(self._run_and_report(repo, paths))
+        self._running[repo['name']] = task
+        task.add_done_callback(lambda _: self._running.pop(repo['name'], None))
+        return 'started'
+
+    async def _run_and_report(self, repo: Dict, changed_paths: List[str]) -> None:
+        results = await self.run_hooks(repo, changed_paths)
+        if not results or self.on_result is None:
+            return
+        try:
+            await self.on_result(repo['name'], results)
+        except Exception as e:
+            logging.error(f"Reporting hook results for {repo['name']} failed: {str(e)}")
+
+    async def run_hooks(self, repo: Dict, changed_paths: List[str]) -> List[Dict]:
+        """Voer de hooks uit waarvan de globs overeenkomen met de gewijzigde paden"""
+        runs = []
+        for hook in repo['hooks']:
+            matched = [path for path in changed_paths if match_path(path, hook.get('paths', []))]
+            if matched:
+                runs.append(self._run_timed(repo, hook, matched))
+        return list(await asyncio.gather(*runs))
+
+    async def _run_timed(self, repo: Dict, hook: Dict, matched: List[str]) -> Dict:
+        hook_name = hook.get('name') or hook.get('entry_point') or str(hook.get('command'))
+        queued = time.perf_counter()
+        error = None
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                await self._run_hook(repo, hook, matched)
+            except Exception as e:
+                logging.error(f"Hook {hook_name} failed for {repo['name']}: {str(e)}")
+                error = str(e)
+            end = time.perf_counter()
+
+        result = {
+            'name': hook_name,
+            'status': 'error' if error else 'success',
+            'duration': round(end - start, 3),
+            'queue_wait': round(start - queued, 3),
+            'files': len(matched)
+        }
+        if error:
+            result['error'] = error
+        return result
+
+    def shutdown(self) -> None:
+        """Annuleer lopende hook runs"""
+        for task in list(self._running.values()):
+            task.cancel()
+
+    async def _run_hook(self, repo: Dict, hook: Dict, matched: List[str]) -> None:
+        timeout = hook.get('timeout', self.default_timeout)
+
+        if 'entry_point' in hook:
+            func = load_entry_point(hook['entry_point'])
+            if asyncio.iscoroutinefunction(func):
+                call = func(repo, matched)
+            else:
+                # Let op: een synchrone hook kan na een timeout niet afgebroken worden
+                call = asyncio.to_thread(func, repo, matched)
+            try:
+                await asyncio.wait_for(call, timeout=timeout)
+            except asyncio.TimeoutError:
+                raise HookError(f"Hook timed out after {timeout}s")
+            return
+
+        command = hook.get('command')
+        if not command:
+            raise HookError("Hook requires a 'command' or 'entry_point'")
+
+        env = dict(os.environ, CHANGED_FILES="\n".join(matched))
+        if isinstance(command, str):
+            process = await asyncio.create_subprocess_shell(
+                command,
+                cwd=repo['local_path'],
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=repo['local_path'],
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise HookError(f"Hook timed out after {timeout}s")
+        finally:
+            # Ook bij een timeout of annulering geen weesproces achterlaten
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        if process.returncode != 0:
+            raise HookError(f"Hook exited with code {process.returncode}: {stderr.decode().strip()}")
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+from controllers.repo_sync import GitError, execute_git_command, get_repository_lock
+
+# Standaard onderhoudsstappen: commit-graph, losse objecten opruimen en packs samenvoegen,
+# gevolgd door `gc --auto` voor reflogs en pack consolidatie boven de drempels van git
+DEFAULT_TASKS = [
+    ['git', 'maintenance', 'run', '--task=commit-graph', '--task=loose-objects', '--task=incremental-repack'],
+    # loose-objects pakt objecten in maar verwijdert ze pas bij de volgende run
+    ['git', 'prune-packed'],
+    # autoDetach uit zodat gc niet op de achtergrond doorloopt terwijl de lock al vrij is
+    ['git', '-c', 'gc.autoDetach=false', 'gc', '--auto']
+]
+
+# Voor git versies zonder `git maintenance` (< 2.30)
+FALLBACK_TASKS = {
+    'maintenance': ['git', 'commit-graph', 'write', '--reachable']
+}
+
+async def count_objects(local_path: str) -> Dict[str, int]:
+    """Parse `git count-objects -v` naar een dictionary met aantallen en groottes (KiB)"""
+    output = await execute_git_command(['git', 'count-objects', '-v'], local_path)
+    counts = {}
+    for line in output.splitlines():
+        key, _, value = line.partition(':')
+        if value.strip().isdigit():
+            counts[key.strip()] = int(value)
+    return counts
+
+class MaintenanceScheduler:
+    """
+    Voert periodiek git onderhoud uit per repository, naast de sync loop.
+    Een repository wordt alleen onderhouden als zijn laatste onderhoud
+    minstens `interval` seconden geleden is, er geen sync bezig is en de
+    volgende sync pas over minstens `idle_window` seconden gepland staat.
+    Repositories worden een voor een onderhouden om de disk niet te belasten.
+    """
+
+    def __init__(self, repositories: List[Dict], state, interval: float = 86400,
+                 check_interval: float = 300, idle_window: float = 5, timeout: float = 1800,
+                 tasks: Optional[List[List[str]]] = None):
+        self.repositories = repositories
+        self.state = state
+        self.interval = interval
+        self.check_interval = check_interval
+        self.idle_window = idle_window
+        self.timeout = timeout
+        self.tasks = tasks or DEFAULT_TASKS
+
+    @classmethod
+    def from_config(cls, repositories: List[Dict], state, config: Optional[Dict]) -> Optional["MaintenanceScheduler"]:
+        """Maak een scheduler op basis van de `maintenance` configuratie sectie"""
+        if not config or not config.get('enabled', True):
+            return None
+        return cls(
+            repositories,
+            state,
+            interval=config.get('interval', 86400),
+            check_interval=config.get('check_interval', 300),
+            idle_window=config.get('idle_window', 5),
+            timeout=config.get('timeout', 1800),
+            tasks=config.get('tasks')
+        )
+
+    def is_due(self, repo: Dict) -> bool:
+        maintenance = self.state.get(repo['name']).get('maintenance') or {}
+        return time.time() - maintenance.get('last_run_ts', 0) >= self.interval
+
+    def is_idle(self, repo: Dict) -> bool:
+        if get_repository_lock(repo['name']).locked():
+            return False
+        next_due = self.state.get(repo['name']).get('next_due', 0)
+        return next_due - time.time() >= self.idle_window
+
+    async def run(self) -> None:
+        """Blijf onderhoud plannen tot de taak geannuleerd wordt"""
+        self.state.schedule_maintenance(self.repositories, self.interval)
+        while True:
+            for repo in self.repositories:
+                try:
+                    if self.is_due(repo) and self.is_idle(repo):
+                        await self.maintain(repo)
+                        await self.state.persist()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Maintenance scheduler error for {repo['name']}: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.check_interval)
+
+    async def maintain(self, repo: Dict) -> Dict:
+        """Voer de onderhoudsstappen uit voor een repository en registreer de metrics"""
+        repo_name = repo['name']
+        local_path = repo['local_path']
+
+        async with get_repository_lock(repo_name):
+            start = time.perf_counter()
+            before, after, error = {}, {}, None
+            try:
+                before = await count_objects(local_path)
+                for task in self.tasks:
+                    await self._run_task(task, local_path)
+                after = await count_objects(local_path)
+            except GitError as e:
+                error = str(e)
+                logging.error(f"Maintenance failed for {repo_name}: {error}")
+            duration = time.perf_counter() - start
+
+        self.state.record_maintenance(repo_name, duration, before, after, error)
+        if not error:
+            logging.info(
+                f"Maintenance for {repo_name} finished in {duration:.1f}s: "
+                f"{before.get('count', 0)} -> {after.get('count', 0)} loose objects, "
+                f"{before.get('packs', 0)} -> {after.get('packs', 0)} packs"
+            )
+        return self.state.get(repo_name)['maintenance']
+
+    async def _run_task(self, task: List[str], local_path: str) -> None:
+        try:
+            await execute_git_command(task, local_path, timeout=self.timeout)
+        except GitError as e:
+            # Alleen terugvallen als deze git versie het commando niet kent
+            fallback = FALLBACK_TASKS.get(task[1])
+            if fallback is None or 'is not a git command' not in str(e):
+                raise
+            logging.info(f"'{' '.join(task[:2])}' unavailable, falling back to '{' '.join(fallback)}'")
+            await execute_git_command(fallback, local_path, timeout=self.timeout)
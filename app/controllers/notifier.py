@@ -1,4 +1,3 @@
-import requests
 import logging
 from datetime import datetime
 from typing import List, Dict, Union
@@ -55,6 +54,53 @@ def create_embed(title: str, repository: str, action: str, files: Union[List[str
     
     return embed
 
+def format_size(size: int) -> str:
+    """Formatteer een grootteverschil in bytes leesbaar met teken"""
+    sign = "+" if size >= 0 else "-"
+    size = abs(size)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{sign}{size:.0f} {unit}" if unit == "B" else f"{sign}{size:.1f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.1f} GB"
+
+def create_analysis_embed(repository: str, analysis: Dict) -> Dict:
+    """Maak een embed met de statistieken van de analyse na een pull"""
+    embed = create_embed(
+        "📊 Wijzigingsanalyse",
+        repository,
+        f"+{analysis['insertions']} / -{analysis['deletions']} regels in {analysis['files']} bestanden",
+        None,
+        "success"
+    )
+    embed["fields"].append({
+        "name": "📏 Grootte",
+        "value": format_size(analysis['size_delta']),
+        "inline": True
+    })
+    if analysis.get('binary_files'):
+        embed["fields"].append({
+            "name": "🧱 Binaire bestanden",
+            "value": str(analysis['binary_files']),
+            "inline": True
+        })
+    if analysis.get('components'):
+        embed["fields"].append({
+            "name": "🧩 Componenten",
+            "value": "\n".join(
+                f"{name}: {stats['files']} bestanden, +{stats['insertions']} / -{stats['deletions']}"
+                for name, stats in sorted(analysis['components'].items())
+            ),
+            "inline": False
+        })
+    if analysis.get('truncated'):
+        embed["fields"].append({
+            "name": "⚠️ Let op",
+            "value": "Analyse ingekort vanwege het aantal bestanden",
+            "inline": False
+        })
+    return embed
+
 def extract_repo_name(update: str) -> str:
     """Extracts repository name from update message"""
     try:
@@ -63,6 +109,20 @@ def extract_repo_name(update: str) -> str:
         logging.error(f"Fout bij extraheren repository naam: {e}")
         return "Onbekende Repository"
 
+def _post_embeds(webhook_url: str, embeds: List[Dict]) -> None:
+    """Verstuur embeds naar de webhook en vertaal fouten naar notificatie exceptions"""
+    # Lazy import: requests is pas nodig bij de eerste notificatie
+    import requests
+
+    try:
+        response = requests.post(webhook_url, json={"embeds": embeds})
+        if response.status_code != 204:
+            raise WebhookResponseError(f"Discord webhook gaf status code: {response.status_code}")
+    except requests.ConnectionError as e:
+        raise WebhookConnectionError(f"Kan geen verbinding maken met Discord webhook: {e}")
+    except requests.RequestException as e:
+        raise DiscordNotificationError(f"Algemene Discord notificatie fout: {e}")
+
 def send_notifications(webhook_url: str, updates: List[str]) -> None:
     try:
         if not updates:
@@ -99,21 +159,22 @@ def send_notifications(webhook_url: str, updates: List[str]) -> None:
                 embeds.append(create_embed(title, repo_name, action, files, status))
 
         if embeds:
-            try:
-                response = requests.post(webhook_url, json={"embeds": embeds})
-                if response.status_code == 204:
-                    logging.info(f"Discord notificaties succesvol verzonden voor {repo_name}")
-                else:
-                    raise WebhookResponseError(f"Discord webhook gaf status code: {response.status_code}")
-            except requests.ConnectionError as e:
-                raise WebhookConnectionError(f"Kan geen verbinding maken met Discord webhook: {e}")
-            except requests.RequestException as e:
-                raise DiscordNotificationError(f"Algemene Discord notificatie fout: {e}")
+            _post_embeds(webhook_url, embeds)
+            logging.info(f"Discord notificaties succesvol verzonden voor {repo_name}")
                 
     except Exception as e:
         logging.error(f"Kritieke fout bij verzenden Discord notificaties: {str(e)}")
         raise
 
+def send_analysis_notification(webhook_url: str, repository: str, analysis: Dict) -> None:
+    """Verstuur de wijzigingsanalyse zodra die op de achtergrond klaar is"""
+    try:
+        _post_embeds(webhook_url, [create_analysis_embed(repository, analysis)])
+
+    except Exception as e:
+        logging.error(f"Kritieke fout bij verzenden Discord analyse notificatie: {str(e)}")
+        raise
+
 def send_notification(webhook_url: str, message: str, status: str = "success") -> None:
     """Voor algemene status updates en foutmeldingen"""
     try:
@@ -124,16 +185,8 @@ def send_notification(webhook_url: str, message: str, status: str = "success") -
         }.get(status, "GitHub Sync Status")
 
         embed = create_embed(title, "Systeem", status.capitalize(), message, status)
-        
-        try:
-            response = requests.post(webhook_url, json={"embeds": [embed]})
-            if response.status_code != 204:
-                raise WebhookResponseError(f"Discord webhook gaf status code: {response.status_code}")
-        except requests.ConnectionError as e:
-            raise WebhookConnectionError(f"Kan geen verbinding maken met Discord webhook: {e}")
-        except requests.RequestException as e:
-            raise DiscordNotificationError(f"Algemene Discord notificatie fout: {e}")
-            
+        _post_embeds(webhook_url, [embed])
+
     except Exception as e:
         logging.error(f"Kritieke fout bij verzenden Discord notificatie: {str(e)}")
         raise
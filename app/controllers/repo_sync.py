@@ -3,13 +3,20 @@ import logging
 import subprocess
 from contextlib import contextmanager
 import os
-from typing import Dict, List, Union, Optional
-from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Any, Dict, List, Union, Optional
 
 class GitError(Exception):
     """Custom exception voor git-gerelateerde fouten"""
     pass
 
+# Per repository lock zodat sync en onderhoud nooit tegelijk in dezelfde worktree werken
+_repository_locks: Dict[str, asyncio.Lock] = {}
+
+def get_repository_lock(repo_name: str) -> asyncio.Lock:
+    """Geef de gedeelde lock voor een repository"""
+    return _repository_locks.setdefault(repo_name, asyncio.Lock())
+
 @contextmanager
 def temporary_logging_suspension():
     """Tijdelijk uitschakelen van logging handlers om file locks te voorkomen."""
@@ -22,7 +29,8 @@ def temporary_logging_suspension():
         for handler in handlers:
             logging.root.addHandler(handler)
 
-async def execute_git_command(command: List[str], local_path: str) -> str:
+async def execute_git_command(command: List[str], local_path: str, input: Optional[str] = None,
+                              timeout: Optional[float] = None) -> str:
     """
     Voer git commando asynchroon uit met verbeterde error handling
     """
@@ -30,10 +38,19 @@ async def execute_git_command(command: List[str], local_path: str) -> str:
         process = await asyncio.create_subprocess_exec(
             *command,
             cwd=local_path,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await process.communicate()
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(input.encode() if input is not None else None),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise GitError(f"Git command timed out after {timeout}s: {' '.join(command)}")
         
         if process.returncode != 0:
             raise GitError(f"Git command failed: {stderr.decode()}")
@@ -42,9 +59,9 @@ async def execute_git_command(command: List[str], local_path: str) -> str:
     except Exception as e:
         raise GitError(f"Error executing git command: {str(e)}")
 
-async def get_repository_changes(local_path: str) -> Optional[List[str]]:
+async def pull_repository(local_path: str) -> Optional[Dict[str, Any]]:
     """
-    Controleer repository op wijzigingen asynchroon
+    Pull een repository en geef de commit hashes en gewijzigde bestanden terug
     """
     try:
         # Get latest commit hash before pull
@@ -61,7 +78,14 @@ async def get_repository_changes(local_path: str) -> Optional[List[str]]:
                 ['git', 'diff', '--name-status', before_hash, after_hash],
                 local_path
             )
-            return [f"{line.split()[0]}: {line.split()[1]}" for line in changes.splitlines()]
+            lines = changes.splitlines()
+            return {
+                'before': before_hash,
+                'after': after_hash,
+                'changes': [f"{line.split()[0]}: {line.split()[1]}" for line in lines],
+                # Alle paden per regel, inclusief beide kanten van een rename
+                'paths': [path for line in lines for path in line.split('\t')[1:]]
+            }
         return None
     except GitError as e:
         logging.error(f"Git error in repository {local_path}: {str(e)}")
@@ -70,20 +94,76 @@ async def get_repository_changes(local_path: str) -> Optional[List[str]]:
         logging.error(f"Unexpected error in repository {local_path}: {str(e)}")
         raise
 
-async def sync_repositories(repositories: List[Dict]) -> Dict[str, Union[str, List[str]]]:
+async def get_remote_head(local_path: str) -> Optional[str]:
+    """
+    Vraag de SHA van de upstream branch op bij de remote zonder te fetchen.
+    Geeft None terug als de huidige branch geen upstream heeft.
+    """
+    branch_ref = await execute_git_command(['git', 'symbolic-ref', '-q', 'HEAD'], local_path)
+    upstream = await execute_git_command(
+        ['git', 'for-each-ref', '--format=%(upstream:remotename) %(upstream:remoteref)', branch_ref],
+        local_path
+    )
+    remote, _, remote_ref = upstream.partition(' ')
+    if not remote or not remote_ref:
+        return None
+
+    output = await execute_git_command(['git', 'ls-remote', remote, remote_ref], local_path)
+    return output.split()[0] if output else None
+
+async def get_repository_changes(local_path: str) -> Optional[List[str]]:
+    """
+    Controleer repository op wijzigingen asynchroon
+    """
+    pull_result = await pull_repository(local_path)
+    return pull_result['changes'] if pull_result else None
+
+async def sync_repositories(repositories: List[Dict], analyzer=None, hooks=None, state=None) -> Dict[str, Any]:
     """
-    Synchroniseer repositories asynchroon met rate limiting
+    Synchroniseer repositories asynchroon met rate limiting.
+
+    Als er een `ChangeAnalyzer` wordt meegegeven, wordt na elke pull met
+    wijzigingen een analyse op de achtergrond gepland; het resultaat bevat
+    per repository of de analyse gepland ('queued') of overgeslagen ('skipped') is.
+    Een `HookPipeline` krijgt elke cyclus de gewijzigde paden per repository
+    en start de hooks op de achtergrond ('started') of stelt ze uit ('deferred').
+    Met een `SyncStateStore` wordt eerst goedkoop via `ls-remote` gecontroleerd
+    of de remote veranderd is; zo niet, dan worden reset en pull overgeslagen.
     """
     results = {
         'status': 'success',
-        'updates': []
+        'updates': [],
+        'analysis': {},
+        'hooks': {}
     }
     
     # Rate limiting semaphore
     semaphore = asyncio.Semaphore(3)  # Max 3 concurrent syncs
     
+    async def is_up_to_date(repo, local_path):
+        try:
+            remote_sha = await get_remote_head(local_path)
+            local_sha = await execute_git_command(['git', 'rev-parse', 'HEAD'], local_path)
+        except GitError as e:
+            logging.warning(f"Remote check failed for {repo['name']}, falling back to pull: {str(e)}")
+            return False
+
+        if remote_sha is None or not state.is_up_to_date(repo['name'], remote_sha, local_sha):
+            return False
+
+        state.record_success(repo, remote_sha, local_sha)
+        return True
+
     async def sync_single_repo(repo):
-        async with semaphore:
+        # Wacht niet op onderhoud dat de repository bezet houdt; dat zou de hele cyclus ophouden
+        lock = get_repository_lock(repo['name'])
+        if lock.locked():
+            logging.info(f"Skipping sync of {repo['name']}: repository is busy with maintenance")
+            if state is not None:
+                state.postpone(repo)
+            return None
+
+        async with lock, semaphore:
             try:
                 repo_name = repo['name']
                 local_path = repo['local_path']
@@ -92,17 +172,48 @@ async def sync_repositories(repositories: List[Dict]) -> Dict[str, Union[str, Li
                     raise GitError(f"Repository path does not exist: {local_path}")
 
                 with temporary_logging_suspension():
-                    await execute_git_command(['git', 'reset', '--hard', 'HEAD'], local_path)
-                    changes = await get_repository_changes(local_path)
+                    if state is not None and await is_up_to_date(repo, local_path):
+                        pull_result = None
+                    else:
+                        start = time.perf_counter()
+                        await execute_git_command(['git', 'reset', '--hard', 'HEAD'], local_path)
+                        pull_result = await pull_repository(local_path)
 
-                if changes:
-                    return [f"{repo_name}: {change}" for change in changes]
-                return []
+                        if state is not None:
+                            state.record_pull_duration(repo_name, time.perf_counter() - start)
+                            local_sha = await execute_git_command(['git', 'rev-parse', 'HEAD'], local_path)
+                            try:
+                                remote_sha = await execute_git_command(['git', 'rev-parse', '@{u}'], local_path)
+                            except GitError:
+                                remote_sha = None
+                            state.record_success(repo, remote_sha, local_sha)
 
             except Exception as e:
                 logging.error(f"Failed to sync {repo['name']}: {str(e)}")
+                if state is not None:
+                    state.record_failure(repo)
                 raise
 
+        # Analyse en hooks buiten de sync semaphore zodat andere repositories door kunnen
+        analysis = None
+        if pull_result and analyzer is not None:
+            queued = analyzer.submit(repo_name, local_path, pull_result['before'], pull_result['after'])
+            analysis = 'queued' if queued else 'skipped'
+
+        hook_status = None
+        if hooks is not None:
+            hook_status = hooks.schedule(repo, pull_result['paths'] if pull_result else [])
+
+        if not pull_result and not hook_status:
+            return None
+
+        return {
+            'name': repo_name,
+            'updates': [f"{repo_name}: {change}" for change in pull_result['changes']] if pull_result else [],
+            'analysis': analysis,
+            'hooks': hook_status
+        }
+
     try:
         # Gebruik asyncio.gather voor parallelle uitvoering
         tasks = [sync_single_repo(repo) for repo in repositories]
@@ -114,7 +225,11 @@ async def sync_repositories(repositories: List[Dict]) -> Dict[str, Union[str, Li
                 results['error'] = str(result)
                 break
             elif result:
-                results['updates'].extend(result)
+                results['updates'].extend(result['updates'])
+                if result['analysis']:
+                    results['analysis'][result['name']] = result['analysis']
+                if result['hooks']:
+                    results['hooks'][result['name']] = result['hooks']
                 
         return results
 
@@ -25,17 +25,13 @@ app.config.update(
     TEMPLATES_AUTO_RELOAD=True
 )
 
-# Database connection in een try-except block
-try:
-    db = DatabaseConnection(
-        host=os.getenv('DB_HOST', 'localhost'),
-        user=os.getenv('DB_USER'),
-        password=os.getenv('DB_PASSWORD'),
-        database=os.getenv('DB_NAME', 'github_auto_pull')
-    )
-except Exception as e:
-    logger.error(f"Database connection failed: {e}")
-    raise
+# DatabaseConnection bewaart alleen de configuratie; verbinden gebeurt per query
+db = DatabaseConnection(
+    host=os.getenv('DB_HOST', 'localhost'),
+    user=os.getenv('DB_USER'),
+    password=os.getenv('DB_PASSWORD'),
+    database=os.getenv('DB_NAME', 'github_auto_pull')
+)
 
 def admin_required(f):
     @wraps(f)
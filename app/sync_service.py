@@ -3,14 +3,17 @@ import asyncio
 import json
 import logging
 import signal
-import aiofiles
 from datetime import datetime
-from filelock import FileLock
-from typing import Dict, Any
+from typing import Dict, Any, List
 from controllers.repo_sync import sync_repositories, GitError
-from controllers.notifier import send_notification, send_notifications
+from controllers.change_analysis import ChangeAnalyzer
+from controllers.hooks import HookPipeline
+from controllers.maintenance import MaintenanceScheduler
+from utils.sync_state import SyncStateStore
+from controllers.notifier import send_notification, send_notifications, send_analysis_notification
 
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'config.json')
+STATE_FILE = os.path.join(os.path.dirname(CONFIG_FILE), 'sync_state.json')
 
 class GracefulExit(SystemExit):
     pass
@@ -20,6 +23,9 @@ def signal_handler(signum, frame):
 
 def setup_logging(log_file: str) -> None:
     """Configureer logging met rotatie en file lock"""
+    import logging.handlers
+    from filelock import FileLock
+
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
     lock = FileLock(log_file + '.lock')
     
@@ -48,6 +54,8 @@ def load_config() -> Dict[str, Any]:
 
 async def update_sync_status(config: Dict[str, Any], repo_name: str, status: str, error: Exception = None) -> None:
     """Update sync status asynchroon"""
+    import aiofiles
+
     try:
         config.setdefault('sync_status', {
             'last_sync_times': {},
@@ -82,6 +90,13 @@ async def update_sync_status(config: Dict[str, Any], repo_name: str, status: str
     except Exception as e:
         logging.error(f"Error updating sync status: {str(e)}")
 
+async def notify(func, *args) -> None:
+    """Verstuur een Discord notificatie zonder de event loop te blokkeren"""
+    try:
+        await asyncio.to_thread(func, *args)
+    except Exception as e:
+        logging.error(f"Notification failed: {str(e)}")
+
 async def main():
     """Hoofdfunctie voor de sync service met graceful shutdown"""
     config = load_config()
@@ -90,28 +105,68 @@ async def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    async def report_analysis(repo_name: str, analysis: Dict[str, Any]) -> None:
+        await notify(send_analysis_notification, config['discord_webhook'], repo_name, analysis)
+
+    analyzer = ChangeAnalyzer.from_config(config.get('analysis'), on_result=report_analysis)
+    async def report_hooks(repo_name: str, hook_results: List[Dict[str, Any]]) -> None:
+        for hook in hook_results:
+            logging.info(
+                f"Hook {hook['name']} for {repo_name}: {hook['status']} in {hook['duration']}s "
+                f"(queued {hook['queue_wait']}s)"
+            )
+        failed_hooks = [f"{hook['name']} ({hook.get('error')})" for hook in hook_results if hook['status'] != 'success']
+        if failed_hooks:
+            await notify(
+                send_notification,
+                config['discord_webhook'],
+                f"Post-sync hooks mislukt voor {repo_name}:\n" + "\n".join(failed_hooks),
+                "warning"
+            )
+
+    hooks = HookPipeline.from_config(config.get('hooks'), on_result=report_hooks)
+
+    # Laad de laatst bekende status en spreid de eerste sync over het interval
+    state = SyncStateStore(config.get('state_file', STATE_FILE), config['sync_interval'])
+    state.load()
+    state.schedule_startup(config['repositories'])
+
+    maintenance = MaintenanceScheduler.from_config(config['repositories'], state, config.get('maintenance'))
+    maintenance_task = None
+
     try:
         logging.info("Starting GitHub Auto Pull Service")
-        await send_notification(
+        await notify(
+            send_notification,
             config['discord_webhook'],
             f"Service gestart - Monitoring {len(config['repositories'])} repositories",
             "success"
         )
 
+        if maintenance is not None:
+            maintenance_task = asyncio.create_task(maintenance.run())
+
         while True:
             try:
-                result = await sync_repositories(config['repositories'])
+                due_repositories = state.due_repositories(config['repositories'])
+                if not due_repositories:
+                    await asyncio.sleep(state.seconds_until_next_due(config['repositories']))
+                    continue
+
+                result = await sync_repositories(due_repositories, analyzer, hooks, state)
+                await state.persist()
                 
                 if result['status'] == 'error':
-                    await send_notification(
+                    await notify(
+                        send_notification,
                         config['discord_webhook'],
                         f"Sync error: {result.get('error')}",
                         "error"
                     )
                 elif result.get('updates'):
-                    await send_notifications(config['discord_webhook'], result['updates'])
+                    await notify(send_notifications, config['discord_webhook'], result['updates'])
                 
-                await asyncio.sleep(config['sync_interval'])
+                await asyncio.sleep(state.seconds_until_next_due(config['repositories']))
 
             except GitError as e:
                 logging.error(f"Git error: {str(e)}")
@@ -123,12 +178,17 @@ async def main():
     except GracefulExit:
         shutdown_msg = "Service shutting down gracefully"
         logging.info(shutdown_msg)
-        await send_notification(config['discord_webhook'], shutdown_msg, "warning")
+        await notify(send_notification, config['discord_webhook'], shutdown_msg, "warning")
     except Exception as e:
         fatal_error = f"Critical error in sync service: {str(e)}"
         logging.critical(fatal_error, exc_info=True)
-        await send_notification(config['discord_webhook'], fatal_error, "error")
+        await notify(send_notification, config['discord_webhook'], fatal_error, "error")
     finally:
+        if maintenance_task is not None:
+            maintenance_task.cancel()
+        hooks.shutdown()
+        if analyzer is not None:
+            analyzer.shutdown()
         logging.info("Service stopped")
         logging.shutdown()
 
@@ -1,5 +1,3 @@
-import mysql.connector
-from mysql.connector import Error
 from contextlib import contextmanager
 import logging
 from datetime import datetime
@@ -15,6 +13,10 @@ class DatabaseConnection:
 
     @contextmanager
     def get_cursor(self):
+        # Lazy import: mysql.connector is traag om te laden en pas nodig bij de eerste query
+        import mysql.connector
+        from mysql.connector import Error
+
         connection = None
         try:
             connection = mysql.connector.connect(**self.config)
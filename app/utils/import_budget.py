@@ -0,0 +1,78 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(APP_DIR)
+
+# Maximale cumulatieve import tijd per entry point in milliseconden
+IMPORT_BUDGETS = {
+    'sync_service': 150,
+    'dashboard.app': 400,
+    'app.utils.migrate_data': 100,
+    'utils.setup_database': 100,
+}
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Importeer een module in een nieuw proces met `-X importtime` en geef de
+    cumulatieve tijd in ms terug, plus de zwaarste directe imports.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([APP_DIR, ROOT_DIR]))
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    total = None
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        cumulative_ms = int(cumulative) / 1000
+        if name.strip() == module:
+            total = cumulative_ms
+        elif name.startswith('   ') and not name.startswith('    '):
+            # Eén niveau inspringing (twee spaties) betekent een directe import van de module
+            imports.append((name.strip(), cumulative_ms))
+
+    if total is None:
+        raise RuntimeError(f"Module {module} not found in importtime output")
+    return total, sorted(imports, key=lambda item: item[1], reverse=True)[:5]
+
+def check_budgets(budgets: Dict[str, float], runs: int) -> bool:
+    """Meet alle entry points en rapporteer de mediaan tegenover het budget"""
+    within_budget = True
+    for module, budget in budgets.items():
+        try:
+            measurements = [measure_import(module) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"{module:<26} ERROR  {e}")
+            within_budget = False
+            continue
+
+        median = statistics.median(total for total, _ in measurements)
+        status = 'OK' if median <= budget else 'OVER'
+        within_budget &= median <= budget
+        print(f"{module:<26} {status:<5} {median:8.1f} ms (budget {budget} ms)")
+        for name, cumulative in measurements[-1][1]:
+            print(f"    {name:<30} {cumulative:8.1f} ms")
+    return within_budget
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Controleer de import tijd van de entry points")
+    parser.add_argument('--runs', type=int, default=5, help="Aantal metingen per module")
+    parser.add_argument('modules', nargs='*', help="Alleen deze modules meten")
+    args = parser.parse_args()
+
+    budgets = {module: IMPORT_BUDGETS.get(module, 100) for module in args.modules} or IMPORT_BUDGETS
+    sys.exit(0 if check_budgets(budgets, args.runs) else 1)
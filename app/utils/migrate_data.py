@@ -1,18 +1,257 @@
+import argparse
 import json
 import logging
-from dotenv import load_dotenv
+import re
+import time
+from datetime import datetime
 import os
 from app.utils.database import DatabaseConnection  # Gebruik het volledige padn
 
-def migrate_existing_data():
+CONFIG_FILE = 'app/config/config.json'
+BATCH_SIZE = 1000
+
+class JsonStream:
+    """
+    Minimale streaming JSON lezer: objecten en arrays worden element voor
+    element doorlopen zodat grote `sync_errors` historieken nooit volledig
+    in het geheugen staan. Na elke `members()`/`items()` stap moet de
+    aanroeper de waarde consumeren met `value()` of `skip()`.
+    """
+
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON: expected '{char}' but found '{found or 'EOF'}'")
+        self._pos += 1
+
+    def value(self):
+        """Decodeer de volgende (kleine) waarde volledig"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # Een getal kan in de volgende chunk doorlopen: `2.` of `-3e` wordt als
+                # prefix geparsed, dus pas accepteren als er een ander teken op volgt
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                truncated = is_number and (end == len(self._buffer) or self._buffer[end] in self._NUMBER_CHARS)
+                if self._eof or not truncated:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def skip(self) -> None:
+        """Sla de volgende waarde over zonder containers op te bouwen"""
+        char = self.peek()
+        if char == '{':
+            for _ in self.members():
+                self.skip()
+        elif char == '[':
+            for _ in self.items():
+                self.skip()
+        else:
+            self.value()
+
+    def members(self):
+        """Doorloop de keys van een object"""
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Invalid JSON: expected ',' or '}}' but found '{char or 'EOF'}'")
+
+    def items(self):
+        """Doorloop de elementen van een array"""
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Invalid JSON: expected ',' or ']' but found '{char or 'EOF'}'")
+
+class MigrationProgress:
+    """Houdt het aantal gemigreerde rijen bij en logt periodiek de snelheid"""
+
+    def __init__(self, interval: float = 5):
+        self.interval = interval
+        self.rows = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            logging.info(f"Migrated {self.rows} rows ({self.rate():.0f} rows/s)")
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+def parse_time(value) -> datetime:
+    """Zet een ISO tijdstempel om; ongeldige waarden worden de huidige tijd"""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.now()
+
+def read_repositories(config_path: str):
+    """Lees de repositories en laatste sync tijden (kleine secties) uit de config"""
+    repositories, last_sync_times = [], {}
+    with open(config_path) as f:
+        stream = JsonStream(f)
+        for key in stream.members():
+            if key == 'repositories':
+                for _ in stream.items():
+                    repositories.append(stream.value())
+            elif key == 'sync_status':
+                for status_key in stream.members():
+                    if status_key == 'last_sync_times':
+                        last_sync_times = stream.value()
+                    else:
+                        stream.skip()
+            else:
+                stream.skip()
+    return repositories, last_sync_times
+
+def load_migration_state(db: DatabaseConnection) -> dict:
+    """
+    Bepaal per repository in de database of de migratie voltooid is (er is een
+    statistieken rij, die als laatste geschreven wordt) en hoeveel errors er
+    al gemigreerd zijn, zodat een onderbroken repository hervat kan worden.
+    """
+    with db.get_cursor() as cursor:
+        cursor.execute("""
+            SELECT r.id, r.name,
+                   (SELECT COUNT(*) FROM sync_statistics st WHERE st.repository_id = r.id) AS statistics,
+                   (SELECT COUNT(*) FROM sync_errors e WHERE e.repository_id = r.id) AS errors
+            FROM repositories r
+        """)
+        return {
+            row['name']: {'id': row['id'], 'complete': row['statistics'] > 0, 'errors': row['errors']}
+            for row in cursor.fetchall()
+        }
+
+def migrate_repository(db: DatabaseConnection, repo: dict, existing, last_sync_time, errors,
+                       stream: JsonStream, batch_size: int, progress: MigrationProgress) -> None:
+    """
+    Migreer een repository met zijn historie. Elke batch errors is een eigen
+    transactie; bij een onderbroken repository (`existing`) worden de al
+    gemigreerde errors overgeslagen. De statistieken rij komt als laatste en
+    markeert de repository als voltooid.
+    `errors` is een iterator over de `sync_errors` array in de stream, of None.
+    """
+    successful = 1 if last_sync_time else 0
+
+    if existing is None:
+        with db.get_cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO repositories (name, url, local_path) VALUES (%s, %s, %s)",
+                (repo['name'], repo['url'], repo['local_path'])
+            )
+            repo_id = cursor.lastrowid
+            if last_sync_time:
+                cursor.execute(
+                    "INSERT INTO sync_status (repository_id, status, last_sync_time) VALUES (%s, %s, %s)",
+                    (repo_id, 'success', parse_time(last_sync_time))
+                )
+        progress.add(1 + successful)
+        offset = 0
+    else:
+        repo_id, offset = existing['id'], existing['errors']
+        logging.info(f"Resuming repository {repo['name']} after {offset} migrated errors")
+
+    failed = 0
+    batch = []
+
+    def flush():
+        with db.get_cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO sync_status (repository_id, status, last_sync_time) VALUES (%s, %s, %s)",
+                [(repo_id, 'error', error_time) for _, error_time in batch]
+            )
+            cursor.executemany(
+                "INSERT INTO sync_errors (repository_id, error_message, error_time) VALUES (%s, %s, %s)",
+                [(repo_id, message, error_time) for message, error_time in batch]
+            )
+        progress.add(len(batch) * 2)
+        batch.clear()
+
+    for _ in errors or ():
+        error = stream.value()
+        if not isinstance(error, dict) or 'error' not in error:
+            logging.warning(f"Skipping malformed sync error for {repo['name']}: {error!r}")
+            continue
+        failed += 1
+        if failed <= offset:
+            continue
+        batch.append((str(error['error']), parse_time(error.get('time'))))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    with db.get_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO sync_statistics (repository_id, total_syncs,
+                successful_syncs, failed_syncs)
+            VALUES (%s, %s, %s, %s)
+        """, (repo_id, successful + failed, successful, failed))
+    progress.add(1)
+
+def migrate_existing_data(config_path: str = CONFIG_FILE, batch_size: int = BATCH_SIZE):
     try:
+        from dotenv import load_dotenv
+
         # Load environment variables
         load_dotenv()
-        
-        # Load existing config
-        with open('app/config/config.json', 'r') as f:
-            config = json.load(f)
-        
+
         # Correct database initialization
         db = DatabaseConnection(
             host=os.getenv('DB_HOST', 'localhost'),
@@ -20,46 +259,80 @@ def migrate_existing_data():
             password=os.getenv('DB_PASSWORD'),
             database=os.getenv('DB_NAME', 'github_auto_pull')
         )
-        
-        # Rest van je code blijft hetzelfde
-        for repo in config['repositories']:
+
+        repositories, last_sync_times = read_repositories(config_path)
+        migration_state = load_migration_state(db)
+
+        # Voltooide repositories worden overgeslagen (idempotent), onderbroken repositories hervat
+        pending = {}
+        skipped = resumed = 0
+        for repo in repositories:
+            if not isinstance(repo, dict) or not all(k in repo for k in ['name', 'url', 'local_path']):
+                logging.error(f"Skipping repository with missing fields: {repo!r}")
+            elif migration_state.get(repo['name'], {}).get('complete'):
+                skipped += 1
+            else:
+                resumed += repo['name'] in migration_state
+                pending[repo['name']] = repo
+        logging.info(
+            f"Migrating {len(pending)} repositories ({resumed} resumed), {skipped} already present"
+        )
+
+        progress = MigrationProgress()
+        migrated = 0
+
+        def migrate(repo, errors=None, stream=None):
+            nonlocal migrated
             try:
-                repo_id = db.add_repository(
-                    repo['name'],
-                    repo['url'],
-                    repo['local_path']
-                )
-                
-                # Migrate sync status
-                if 'sync_status' in config:
-                    status_data = config['sync_status']
-                    
-                    if repo['name'] in status_data.get('last_sync_times', {}):
-                        db.update_sync_status(
-                            repo_id,
-                            'success',
-                            None
-                        )
-                    
-                    if repo['name'] in status_data.get('sync_errors', {}):
-                        for error in status_data['sync_errors'][repo['name']]:
-                            db.update_sync_status(
-                                repo_id,
-                                'error',
-                                error['error']
-                            )
-                    
+                migrate_repository(db, repo, migration_state.get(repo['name']),
+                                   last_sync_times.get(repo['name']), errors, stream, batch_size, progress)
+                migrated += 1
                 logging.info(f"Migrated repository: {repo['name']}")
-                
             except Exception as e:
                 logging.error(f"Error migrating repository {repo['name']}: {e}")
-                continue
-                
-        logging.info("Data migration completed")
-        
+                # Sla de rest van de historie over zodat de stream synchroon blijft
+                for _ in errors or ():
+                    stream.skip()
+
+        # Stream de error historie en migreer elke repository zodra zijn historie begint
+        with open(config_path) as f:
+            stream = JsonStream(f)
+            for key in stream.members():
+                if key != 'sync_status':
+                    stream.skip()
+                    continue
+                for status_key in stream.members():
+                    if status_key != 'sync_errors':
+                        stream.skip()
+                        continue
+                    for repo_name in stream.members():
+                        if repo_name in pending and stream.peek() == '[':
+                            migrate(pending.pop(repo_name), stream.items(), stream)
+                        else:
+                            stream.skip()
+
+        # Repositories zonder error historie
+        for repo in list(pending.values()):
+            migrate(repo)
+
+        logging.info(
+            f"Data migration completed: {migrated} repositories migrated, {skipped} skipped, "
+            f"{progress.rows} rows ({progress.rate():.0f} rows/s)"
+        )
+
     except Exception as e:
         logging.error(f"Migration failed: {e}")
         raise
 
 if __name__ == "__main__":
-    migrate_existing_data()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] - %(message)s')
+
+    parser = argparse.ArgumentParser(
+        description="Migreer config.json data naar de database. Elke batch wordt apart gecommit; "
+                    "een onderbroken migratie hervat bij een nieuwe run na de laatst gecommitte batch."
+    )
+    parser.add_argument('--config', default=CONFIG_FILE, help="Pad naar config.json")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Aantal errors per insert batch")
+    args = parser.parse_args()
+
+    migrate_existing_data(args.config, args.batch_size)
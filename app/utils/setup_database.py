@@ -1,10 +1,13 @@
-from mysql.connector import connect, Error
-from dotenv import load_dotenv
 import os
 import logging
 
 def setup_database():
+    # Lazy imports: dotenv en de MySQL driver zijn alleen nodig bij het uitvoeren
+    from dotenv import load_dotenv
+    from mysql.connector import connect, Error
+
     load_dotenv()
+    connection = None
     
     try:
         connection = connect(
@@ -68,7 +71,7 @@ def setup_database():
         logging.error(f"Error setting up database: {e}")
         raise
     finally:
-        if connection.is_connected():
+        if connection and connection.is_connected():
             cursor.close()
             connection.close()
 
@@ -0,0 +1,168 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class SyncStateStore:
+    """
+    Persistente status per repository: laatst geziene remote en lokale SHA,
+    tijd van de laatste succesvolle sync en wanneer de volgende sync gepland
+    staat. Wordt bij het opstarten geladen zodat een herstart niet direct
+    alle repositories tegelijk volledig synchroniseert.
+    """
+
+    def __init__(self, path: str, default_interval: float):
+        self.path = path
+        self.default_interval = default_interval
+        self.repositories: Dict[str, Dict] = {}
+        self._save_lock = threading.Lock()
+
+    def load(self) -> None:
+        """Laad de status; een ontbrekend of corrupt bestand geeft een lege status"""
+        try:
+            with open(self.path) as f:
+                self.repositories = json.load(f).get('repositories', {})
+        except FileNotFoundError:
+            self.repositories = {}
+        except (json.JSONDecodeError, AttributeError) as e:
+            logging.warning(f"Ignoring invalid sync state file {self.path}: {str(e)}")
+            self.repositories = {}
+
+    def save(self, snapshot: Optional[Dict[str, Dict]] = None) -> None:
+        """
+        Schrijf de status atomair weg zodat een crash geen half bestand
+        achterlaat. Elke schrijfactie gebruikt een eigen tijdelijk bestand en
+        gelijktijdige aanroepen uit verschillende threads worden geserialiseerd.
+        """
+        data = {'repositories': snapshot if snapshot is not None else copy.deepcopy(self.repositories)}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._save_lock:
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + '.', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f, indent=4)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+    async def persist(self) -> None:
+        """
+        Sla de status op vanuit de event loop: de snapshot wordt op de loop
+        gemaakt, zodat het schrijven in een thread niet botst met updates.
+        """
+        snapshot = copy.deepcopy(self.repositories)
+        await asyncio.to_thread(self.save, snapshot)
+
+    def get(self, repo_name: str) -> Dict:
+        return self.repositories.get(repo_name, {})
+
+    def interval_for(self, repo: Dict) -> float:
+        return repo.get('sync_interval', self.default_interval)
+
+    def is_up_to_date(self, repo_name: str, remote_sha: str, local_sha: str) -> bool:
+        """Controleer of de remote niet veranderd is sinds de laatste geslaagde sync"""
+        if remote_sha == local_sha:
+            return True
+        entry = self.get(repo_name)
+        return entry.get('last_remote_sha') == remote_sha and entry.get('last_local_sha') == local_sha
+
+    def record_success(self, repo: Dict, remote_sha: Optional[str], local_sha: str) -> None:
+        entry = self.repositories.setdefault(repo['name'], {})
+        entry.update({
+            'last_remote_sha': remote_sha,
+            'last_local_sha': local_sha,
+            'last_success': datetime.now().isoformat(),
+            'next_due': time.time() + self.interval_for(repo)
+        })
+
+    def record_pull_duration(self, repo_name: str, duration: float) -> None:
+        """
+        Houd een voortschrijdend gemiddelde van de pull tijd bij, en sinds het
+        laatste onderhoud ook het gemiddelde na onderhoud en de verbetering.
+        """
+        entry = self.repositories.setdefault(repo_name, {})
+        average = entry.get('avg_pull_duration')
+        entry['avg_pull_duration'] = duration if average is None else 0.7 * average + 0.3 * duration
+
+        maintenance = entry.get('maintenance')
+        if maintenance and maintenance.get('pull_time_before') is not None:
+            pulls = maintenance.get('pulls_since', 0) + 1
+            after = maintenance.get('pull_time_after') or 0.0
+            maintenance['pulls_since'] = pulls
+            maintenance['pull_time_after'] = after + (duration - after) / pulls
+            maintenance['pull_time_improvement'] = maintenance['pull_time_before'] - maintenance['pull_time_after']
+
+    def record_maintenance(self, repo_name: str, duration: float, before: Dict, after: Dict,
+                           error: Optional[str] = None) -> None:
+        entry = self.repositories.setdefault(repo_name, {})
+        entry['maintenance'] = {
+            'status': 'error' if error else 'success',
+            'error': error,
+            'last_run': datetime.now().isoformat(),
+            'last_run_ts': time.time(),
+            'duration': round(duration, 3),
+            'objects_before': before,
+            'objects_after': after,
+            'pull_time_before': entry.get('avg_pull_duration'),
+            'pull_time_after': None,
+            'pulls_since': 0
+        }
+
+    def record_failure(self, repo: Dict) -> None:
+        self.postpone(repo)
+
+    def postpone(self, repo: Dict) -> None:
+        """Plan de volgende sync een interval later zonder de status te wijzigen"""
+        entry = self.repositories.setdefault(repo['name'], {})
+        entry['next_due'] = time.time() + self.interval_for(repo)
+
+    def schedule_startup(self, repositories: List[Dict]) -> None:
+        """
+        Verdeel de eerste sync van elke repository over zijn interval. Een
+        geplande sync die nog binnen het interval valt blijft behouden.
+        """
+        now = time.time()
+        names = {repo['name'] for repo in repositories}
+        self.repositories = {name: entry for name, entry in self.repositories.items() if name in names}
+
+        for index, repo in enumerate(repositories):
+            interval = self.interval_for(repo)
+            entry = self.repositories.setdefault(repo['name'], {})
+            next_due = entry.get('next_due')
+            if next_due is None or not now <= next_due <= now + interval:
+                entry['next_due'] = now + interval * index / len(repositories)
+
+    def schedule_maintenance(self, repositories: List[Dict], interval: float) -> None:
+        """
+        Geef repositories zonder onderhoudsstatus een fictieve laatste run,
+        zodat het eerste onderhoud over het interval verdeeld wordt in plaats
+        van direct na het opstarten voor alle repositories tegelijk.
+        """
+        now = time.time()
+        for index, repo in enumerate(repositories):
+            entry = self.repositories.setdefault(repo['name'], {})
+            if not entry.get('maintenance'):
+                entry['maintenance'] = {'last_run_ts': now - interval + interval * (index + 1) / len(repositories)}
+
+    def due_repositories(self, repositories: List[Dict]) -> List[Dict]:
+        now = time.time()
+        return [repo for repo in repositories if self.get(repo['name']).get('next_due', 0) <= now]
+
+    def seconds_until_next_due(self, repositories: List[Dict]) -> float:
+        next_due = min(
+            (self.get(repo['name']).get('next_due', 0) for repo in repositories),
+            default=time.time() + self.default_interval
+        )
+        return min(max(next_due - time.time(), 0), self.default_interval)
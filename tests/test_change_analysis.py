@@ -0,0 +1,120 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'app'))
+
+from controllers.change_analysis import (
+    NULL_OID, ChangeAnalyzer, classify_path, parse_raw_diff, summarize_changes
+)
+
+OLD_A = "a" * 40
+NEW_A = "b" * 40
+NEW_B = "c" * 40
+OLD_C = "d" * 40
+
+
+def raw_entry(old_oid, new_oid, status, path):
+    return f":100644 100644 {old_oid} {new_oid} {status}\0{path}\0"
+
+
+RAW = (
+    raw_entry(OLD_A, NEW_A, "M", "src/app.py")
+    + raw_entry(NULL_OID, NEW_B, "A", "docs/with space.md")
+    + raw_entry(OLD_C, NULL_OID, "D", "assets/logo.png")
+)
+
+
+def test_parse_raw_diff_reads_z_output():
+    entries, blob_ids, truncated = parse_raw_diff(RAW, max_files=10)
+
+    assert [(e["path"], e["status"]) for e in entries] == [
+        ("src/app.py", "M"), ("docs/with space.md", "A"), ("assets/logo.png", "D")
+    ]
+    assert blob_ids == sorted([OLD_A, NEW_A, NEW_B, OLD_C])
+    assert truncated is False
+
+
+def test_parse_raw_diff_truncates_at_max_files():
+    entries, blob_ids, truncated = parse_raw_diff(RAW, max_files=2)
+
+    assert [e["path"] for e in entries] == ["src/app.py", "docs/with space.md"]
+    assert OLD_C not in blob_ids
+    assert truncated is True
+
+
+def test_summarize_changes():
+    entries, _, _ = parse_raw_diff(RAW, max_files=10)
+    numstat = "3\t1\tsrc/app.py\0" "10\t0\tdocs/with space.md\0" "-\t-\tassets/logo.png\0"
+    blob_sizes = f"{OLD_A} 100\n{NEW_A} 150\n{NEW_B} 40\n{OLD_C} 500\n"
+    classification = {"code": ["src/*"], "assets": ["assets/*", "*.png"]}
+
+    summary = summarize_changes(entries, numstat, blob_sizes, classification)
+
+    assert summary["files"] == 3
+    assert summary["insertions"] == 13
+    assert summary["deletions"] == 1
+    assert summary["binary_files"] == 1
+    # +50 gewijzigd, +40 toegevoegd, -500 verwijderd
+    assert summary["size_delta"] == -410
+    assert summary["components"]["code"] == {"files": 1, "insertions": 3, "deletions": 1, "size_delta": 50}
+    assert summary["components"]["other"]["size_delta"] == 40
+    assert summary["components"]["assets"] == {"files": 1, "insertions": 0, "deletions": 0, "size_delta": -500}
+    assert summary["largest"][0] == "docs/with space.md"
+
+
+def test_classify_path_first_match_wins():
+    classification = {"docs": ["*.md"], "code": ["src/*"]}
+
+    assert classify_path("src/README.md", classification) == "docs"
+    assert classify_path("src/main.py", classification) == "code"
+    assert classify_path("setup.cfg", classification) == "other"
+
+
+def git(path, *args):
+    subprocess.run(["git", *args], cwd=path, check=True, capture_output=True)
+
+
+def make_repository(path):
+    git(path, "init", "-q")
+    git(path, "config", "user.email", "test@example.com")
+    git(path, "config", "user.name", "Test")
+    (path / "a.txt").write_text("one\n")
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "first")
+    (path / "a.txt").write_text("one\ntwo\n")
+    (path / "b.txt").write_text("new\n")
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "second")
+    return "HEAD~1", "HEAD"
+
+
+def test_stuck_job_does_not_fail_concurrent_analysis(tmp_path):
+    before, after = make_repository(tmp_path)
+    analyzer = ChangeAnalyzer(max_workers=2, timeout=1)
+
+    async def scenario():
+        stuck = asyncio.ensure_future(analyzer._run(time.sleep, 3))
+        await asyncio.sleep(0.2)
+        analysis = await analyzer.analyze(str(tmp_path), before, after)
+        try:
+            await stuck
+        except asyncio.TimeoutError:
+            timed_out = True
+        else:
+            timed_out = False
+        # Na het vervangen van de pool werkt een nieuwe analyse gewoon
+        again = await analyzer.analyze(str(tmp_path), before, after)
+        return analysis, timed_out, again
+
+    try:
+        analysis, timed_out, again = asyncio.run(scenario())
+    finally:
+        analyzer.shutdown()
+
+    assert timed_out
+    assert analysis is not None and analysis["files"] == 2
+    assert again == analysis
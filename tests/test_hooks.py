@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'app'))
+
+from controllers import hooks as hooks_module
+from controllers.hooks import HookPipeline
+
+REPO = {'name': 'repo', 'local_path': '.', 'hooks': [{'name': 'all', 'paths': ['*'], 'command': ['true']}]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+def make_pipeline(monkeypatch, debounce):
+    clock = FakeClock()
+    monkeypatch.setattr(hooks_module, 'time', clock)
+    pipeline = HookPipeline(debounce=debounce)
+    runs = []
+    release = asyncio.Event()
+
+    async def run_hooks(repo, changed_paths):
+        runs.append(changed_paths)
+        await release.wait()
+        return []
+
+    pipeline.run_hooks = run_hooks
+    return pipeline, clock, runs, release
+
+
+def test_schedule_debounces_and_merges_paths(monkeypatch):
+    async def scenario():
+        pipeline, clock, runs, release = make_pipeline(monkeypatch, debounce=30)
+        release.set()
+
+        assert pipeline.schedule(REPO, ['a.py']) == 'deferred'
+        clock.now += 10
+        assert pipeline.schedule(REPO, ['b.py']) == 'deferred'
+        # De debounce telt vanaf de laatste wijziging
+        clock.now += 25
+        assert pipeline.schedule(REPO, []) == 'deferred'
+        clock.now += 5
+        assert pipeline.schedule(REPO, []) == 'started'
+        await asyncio.sleep(0)
+        assert pipeline.schedule(REPO, []) is None
+        return runs
+
+    assert asyncio.run(scenario()) == [['a.py', 'b.py']]
+
+
+def test_schedule_holds_changes_while_running(monkeypatch):
+    async def scenario():
+        pipeline, clock, runs, release = make_pipeline(monkeypatch, debounce=0)
+
+        assert pipeline.schedule(REPO, ['a.py']) == 'started'
+        await asyncio.sleep(0)
+        assert pipeline.schedule(REPO, ['b.py']) == 'deferred'
+        assert runs == [['a.py']]
+
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert pipeline.schedule(REPO, []) == 'started'
+        await asyncio.sleep(0)
+        return runs
+
+    assert asyncio.run(scenario()) == [['a.py'], ['b.py']]
+
+
+def test_schedule_without_hooks():
+    pipeline = HookPipeline()
+    assert pipeline.schedule({'name': 'plain'}, ['a.py']) is None
+
+
+def test_cancelled_hook_kills_process(tmp_path):
+    pid_file = tmp_path / 'pid'
+    repo = {'name': 'repo', 'local_path': str(tmp_path)}
+    hook = {'command': ['sh', '-c', f'echo $$ > {pid_file}; exec sleep 30']}
+
+    async def scenario():
+        pipeline = HookPipeline()
+        task = asyncio.ensure_future(pipeline._run_hook(repo, hook, ['a.py']))
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return int(pid_file.read_text())
+
+    pid = asyncio.run(scenario())
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return
+    raise AssertionError(f"Hook process {pid} is still running")
@@ -0,0 +1,23 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.import_budget import IMPORT_BUDGETS, check_budgets
+
+# Entry points die bij het importeren optionele pakketten nodig hebben
+OPTIONAL_DEPENDENCIES = {
+    'dashboard.app': ['flask', 'dotenv'],
+}
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS))
+def test_import_within_budget(module):
+    missing = [name for name in OPTIONAL_DEPENDENCIES.get(module, []) if importlib.util.find_spec(name) is None]
+    if missing:
+        pytest.skip(f"{module} needs {', '.join(missing)}")
+
+    assert check_budgets({module: IMPORT_BUDGETS[module]}, runs=3)
@@ -0,0 +1,53 @@
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.migrate_data import JsonStream
+
+DOCUMENT = json.dumps({
+    "a": "xxxxx",
+    "b": 1.5,
+    "numbers": [2.5, -3e10, 0, -0.25, 1E+5, 7e-3, 12345678901234567890],
+    "literals": [True, False, None],
+    "text": ["éè \"quoted\" \\ slash", "", "\n\t"],
+    "nested": {"empty_object": {}, "empty_array": [], "deep": [[1, [2, {"x": -1.0}]]]},
+    "sync_errors": {"repo": [{"time": "2024-12-20T22:44:36", "error": "e" * 40}] * 3}
+}, indent=4)
+
+
+def read_value(stream):
+    """Bouw een waarde volledig op via members()/items() zoals de migratie de stream doorloopt"""
+    char = stream.peek()
+    if char == '{':
+        return {key: read_value(stream) for key in stream.members()}
+    if char == '[':
+        return [read_value(stream) for _ in stream.items()]
+    return stream.value()
+
+
+def test_stream_matches_json_loads_for_every_chunk_size():
+    expected = json.loads(DOCUMENT)
+    for chunk_size in range(1, len(DOCUMENT) + 2):
+        stream = JsonStream(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+        assert read_value(stream) == expected, f"chunk_size={chunk_size}"
+        assert stream.peek() == ''
+
+
+def test_numbers_split_across_chunks():
+    for document in ['[2.5]', '[-3e10]', '{"a": "xxxxx", "b": 1.5}', '[1, 22, 333.75e-2]']:
+        for chunk_size in range(1, len(document) + 1):
+            stream = JsonStream(io.StringIO(document), chunk_size=chunk_size)
+            assert read_value(stream) == json.loads(document), f"{document} chunk_size={chunk_size}"
+
+
+def test_skip_leaves_stream_in_sync():
+    for chunk_size in (1, 3, 7, 64):
+        stream = JsonStream(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+        keys = []
+        for key in stream.members():
+            keys.append(key)
+            stream.skip()
+        assert keys == list(json.loads(DOCUMENT))
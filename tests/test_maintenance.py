@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'app'))
+
+from controllers import maintenance as maintenance_module
+from controllers.maintenance import FALLBACK_TASKS, MaintenanceScheduler
+from controllers.repo_sync import GitError
+
+TASK = ['git', 'maintenance', 'run', '--task=commit-graph']
+
+
+def run_task(monkeypatch, error):
+    calls = []
+
+    async def execute_git_command(command, local_path, timeout=None):
+        calls.append(command)
+        if command == TASK:
+            raise GitError(error)
+        return ''
+
+    monkeypatch.setattr(maintenance_module, 'execute_git_command', execute_git_command)
+    scheduler = MaintenanceScheduler([], state=None)
+    asyncio.run(scheduler._run_task(TASK, '.'))
+    return calls
+
+
+def test_falls_back_when_command_is_unknown(monkeypatch):
+    calls = run_task(monkeypatch, "Git command failed: git: 'maintenance' is not a git command. See 'git --help'.")
+    assert calls == [TASK, FALLBACK_TASKS['maintenance']]
+
+
+@pytest.mark.parametrize('error', [
+    "Git command timed out after 1800s: git maintenance run",
+    "Git command failed: fatal: Unable to create '.git/index.lock': File exists."
+])
+def test_other_errors_are_raised(monkeypatch, error):
+    with pytest.raises(GitError):
+        run_task(monkeypatch, error)
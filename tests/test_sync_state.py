@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'app'))
+
+from utils.sync_state import SyncStateStore
+
+INTERVAL = 400
+REPOSITORIES = [{'name': name} for name in ('a', 'b', 'c', 'd')]
+
+
+def make_store(tmp_path, repositories=None):
+    store = SyncStateStore(str(tmp_path / 'sync_state.json'), INTERVAL)
+    store.repositories = repositories or {}
+    return store
+
+
+def offsets(store, now):
+    return [round(store.get(repo['name'])['next_due'] - now) for repo in REPOSITORIES]
+
+
+def test_schedule_startup_staggers_first_sync(tmp_path):
+    store = make_store(tmp_path)
+    now = time.time()
+
+    store.schedule_startup(REPOSITORIES)
+
+    assert offsets(store, now) == [0, 100, 200, 300]
+    assert [repo['name'] for repo in store.due_repositories(REPOSITORIES)] == ['a']
+
+
+def test_schedule_startup_keeps_planned_and_reassigns_invalid(tmp_path):
+    now = time.time()
+    store = make_store(tmp_path, {
+        'a': {'next_due': now + 250},               # binnen het interval: behouden
+        'b': {'next_due': now - 1000},              # verlopen tijdens downtime
+        'c': {'next_due': now + 10 * INTERVAL},     # buiten het interval
+        'd': {'last_local_sha': 'abc'}              # nog nooit gepland
+    })
+
+    store.schedule_startup(REPOSITORIES)
+
+    assert offsets(store, now) == [250, 100, 200, 300]
+    assert store.get('d')['last_local_sha'] == 'abc'
+
+
+def test_schedule_startup_respects_repository_interval(tmp_path):
+    store = make_store(tmp_path)
+    repositories = [{'name': 'a'}, {'name': 'b', 'sync_interval': 40}]
+    now = time.time()
+
+    store.schedule_startup(repositories)
+
+    assert round(store.get('b')['next_due'] - now) == 20
+
+
+def test_schedule_startup_drops_removed_repositories(tmp_path):
+    store = make_store(tmp_path, {'a': {'next_due': 0}, 'removed': {'next_due': 0}})
+
+    store.schedule_startup(REPOSITORIES)
+
+    assert 'removed' not in store.repositories
+    assert set(store.repositories) == {'a', 'b', 'c', 'd'}
+
+
+def test_is_up_to_date(tmp_path):
+    store = make_store(tmp_path)
+    store.record_success({'name': 'a'}, remote_sha='remote1', local_sha='local1')
+
+    # Remote en lokaal gelijk: altijd bijgewerkt
+    assert store.is_up_to_date('b', 'same', 'same')
+    # Zelfde remote en lokale SHA als bij de laatste geslaagde sync
+    assert store.is_up_to_date('a', 'remote1', 'local1')
+    # Nieuwe commits op de remote of een gewijzigde worktree
+    assert not store.is_up_to_date('a', 'remote2', 'local1')
+    assert not store.is_up_to_date('a', 'remote1', 'local2')
+    assert not store.is_up_to_date('b', 'remote1', 'local1')
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    store = make_store(tmp_path)
+    store.record_success({'name': 'a'}, remote_sha='r', local_sha='l')
+    store.save()
+
+    loaded = make_store(tmp_path)
+    loaded.load()
+
+    assert loaded.get('a')['last_remote_sha'] == 'r'
+    assert os.listdir(tmp_path) == ['sync_state.json']
+
+
+def test_schedule_maintenance_staggers_first_run(tmp_path):
+    store = make_store(tmp_path, {'a': {'maintenance': {'last_run_ts': 5.0, 'status': 'success'}}})
+    now = time.time()
+
+    store.schedule_maintenance(REPOSITORIES, INTERVAL)
+
+    assert store.get('a')['maintenance']['last_run_ts'] == 5.0
+    first_runs = [round(store.get(name)['maintenance']['last_run_ts'] + INTERVAL - now) for name in ('b', 'c', 'd')]
+    assert first_runs == [200, 300, 400]